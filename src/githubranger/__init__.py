@@ -1,7 +1,19 @@
-from .helpers import clone, ensure_repo_state
+from .helpers import clone, clone_refs_only, ensure_repo_state
 from .org import Org
 from .repo import Repo
 from .token import Token
 from .user import User
+from .util import close_session, enable_disk_cache, session
 
-__all__ = ["Org", "Repo", "Token", "User", "clone", "ensure_repo_state"]
+__all__ = [
+    "Org",
+    "Repo",
+    "Token",
+    "User",
+    "clone",
+    "clone_refs_only",
+    "close_session",
+    "enable_disk_cache",
+    "ensure_repo_state",
+    "session",
+]
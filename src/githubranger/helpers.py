@@ -2,6 +2,8 @@ import logging
 import pathlib
 import subprocess
 
+logger = logging.getLogger(__name__)
+
 
 def ensure_repo_state(repo, template=None, private=True, users=None):
     """Refresh the repo by creating it if it doesn't exist, or updating it if it does.
@@ -23,27 +25,73 @@ def ensure_repo_state(repo, template=None, private=True, users=None):
         A list of User instances representing the GitHub users to add as collaborators
         to the repository (default is None).
 
+    Raises
+    ------
+    ValueError
+        If the repository has to be created and the template does not exist.
+
     """
     if not repo.exists():
-        repo.create(private=private, template=template)
+        # create() is told to skip its checks to avoid probing the repository again,
+        # but a missing template should still be reported as such.
+        if template is not None and not template.exists():
+            raise ValueError(f"Template '{template}' does not exist.")
+        repo.create(private=private, template=template, check_exists=False)
     else:
-        logging.warning(f"Repository '{repo}' already exists.")
+        logger.warning("Repository '%s' already exists.", repo)
 
     if users:
-        for user in users:
-            if not user.exists():
-                logging.warning(f"User '{user}' does not exist.")
-                continue
+        repo.add_users(users)
 
-            if user.can_access(repo):
-                logging.warning(f"User '{user}' already has access to repo '{repo}'.")
-            else:
-                repo.add_user(user)
 
-
-def clone(repo, destination=None):
+def clone(repo, destination=None, filter_spec="blob:none", depth=None):
     """Clone a GitHub repository to destination directory.
 
+    By default a blobless partial clone is made: the working tree is checked out as
+    usual, but file contents from history are only downloaded when git needs them.
+
+    Parameters
+    ----------
+    repo : Repo
+        An instance of the Repo class representing the GitHub repository to clone.
+    destination : str or pathlib.Path, optional
+        The local directory where the repository should be cloned. If None, the current
+        working directory will be used.
+    filter_spec : str, optional
+        Partial clone filter passed to ``git clone --filter`` (default is "blob:none").
+        Use "tree:0" to skip trees as well, or None for a full clone.
+    depth : int, optional
+        If given, make a shallow clone with history truncated to this many commits.
+
+    """
+    if destination is None:
+        destination = pathlib.Path.cwd()
+    else:
+        destination = pathlib.Path(destination)
+
+    destination.mkdir(parents=True, exist_ok=True)
+
+    clone_command = ["git", "clone"]
+    if filter_spec is not None:
+        clone_command.append(f"--filter={filter_spec}")
+    if depth is not None:
+        clone_command.append(f"--depth={depth}")
+    clone_command += [repo.clone_url, str(destination / repo.name)]
+
+    try:
+        subprocess.run(clone_command, check=True)
+        logger.info("Successfully cloned %s into %s", repo, destination)
+    except subprocess.CalledProcessError as e:
+        logger.error("Failed to clone repository: %s", e)
+
+
+def clone_refs_only(repo, destination=None):
+    """Clone only the commits and refs of a GitHub repository.
+
+    Makes a bare clone with the "tree:0" filter, which downloads no trees or file
+    contents. This is enough to inspect branches, tags and commit history locally
+    without going through the REST API.
+
     Parameters
     ----------
     repo : Repo
@@ -60,10 +108,17 @@ def clone(repo, destination=None):
 
     destination.mkdir(parents=True, exist_ok=True)
 
-    clone_command = ["git", "clone", repo.clone_url, str(destination / repo.name)]
+    clone_command = [
+        "git",
+        "clone",
+        "--bare",
+        "--filter=tree:0",
+        repo.clone_url,
+        str(destination / f"{repo.name}.git"),
+    ]
 
     try:
         subprocess.run(clone_command, check=True)
-        logging.info(f"Successfully cloned {repo} into {destination}")
+        logger.info("Successfully cloned refs of %s into %s", repo, destination)
     except subprocess.CalledProcessError as e:
-        logging.error(f"Failed to clone repository: {e}")
+        logger.error("Failed to clone repository: %s", e)
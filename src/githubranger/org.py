@@ -1,8 +1,31 @@
+import functools
+import operator
+
 import pandas as pd
 import tqdm
 
 from .token import Token
-from .util import get
+from .util import get, paginate
+
+_REPO_COLUMNS = (
+    "id",
+    "name",
+    "full_name",
+    "description",
+    "private",
+    "is_template",
+    "url",
+    "html_url",
+    "clone_url",
+    "fork",
+    "created_at",
+    "updated_at",
+    "pushed_at",
+    "default_branch",
+    "size",
+    "archived",
+)
+_repo_row = operator.itemgetter(*_REPO_COLUMNS)
 
 
 class Org:
@@ -19,6 +42,7 @@ class Org:
     def __init__(self, name):
         self.name = name
         self.api_url = f"https://api.github.com/orgs/{self.name}"
+        self._members = None
 
     def __repr__(self):
         """Return a string representation of the organization."""
@@ -41,6 +65,38 @@ class Org:
         except ValueError:
             return False
 
+    @functools.cached_property
+    def _meta(self):
+        """Organization metadata, fetched once and reused until refresh()."""
+        return get(self.api_url, headers=Token.headers())
+
+    def refresh(self):
+        """Discard cached metadata and members so that they are fetched again."""
+        self.__dict__.pop("_meta", None)
+        self._members = None
+
+    def members(self):
+        """
+        Get the logins of all members of the organization.
+
+        The result is cached until refresh() is called.
+
+        Returns
+        -------
+        frozenset of str
+            Lower-cased logins of the organization members.
+
+        """
+        if self._members is None:
+            url = f"{self.api_url}/members"
+            self._members = frozenset(
+                member["login"].lower()
+                for page in paginate(url, headers=Token.headers())
+                for member in page
+            )
+
+        return self._members
+
     @property
     def n_private_repos(self):
         """
@@ -52,8 +108,7 @@ class Org:
             Number of private repositories.
 
         """
-        url = f"{self.api_url}"
-        return get(url, headers=Token.headers()).get("total_private_repos", 0)
+        return self._meta.get("total_private_repos", 0)
 
     @property
     def n_public_repos(self):
@@ -66,8 +121,7 @@ class Org:
             Number of public repositories.
 
         """
-        url = f"{self.api_url}"
-        return get(url, headers=Token.headers()).get("public_repos", 0)
+        return self._meta.get("public_repos", 0)
 
     @property
     def n_repos(self):
@@ -95,59 +149,31 @@ class Org:
 
         """
         url = f"{self.api_url}/repos"
-        params = {"per_page": 100, "page": 1}
-
-        data = pd.DataFrame()
-        params = {"per_page": 100, "page": 1}
 
-        fetched_repos = 0
+        pages = []
         with tqdm.tqdm(total=self.n_repos, desc="Fetching repos") as pbar:
-            while True:
-                if not (page := get(url, headers=Token.headers(), params=params)):
-                    break
-
-                page_data = (
-                    pd.DataFrame(page)
-                    .loc[
-                        :,
-                        [
-                            "id",
-                            "name",
-                            "full_name",
-                            "description",
-                            "private",
-                            "is_template",
-                            "url",
-                            "html_url",
-                            "clone_url",
-                            "fork",
-                            "created_at",
-                            "updated_at",
-                            "pushed_at",
-                            "default_branch",
-                            "size",
-                            "archived",
-                        ],
-                    ]
-                    .set_index("id", verify_integrity=True)
-                    .assign(
-                        created_at=lambda df_: pd.to_datetime(
-                            df_.created_at
-                        ).dt.tz_localize(None),
-                        updated_at=lambda df_: pd.to_datetime(
-                            df_.updated_at
-                        ).dt.tz_localize(None),
-                        pushed_at=lambda df_: pd.to_datetime(
-                            df_.pushed_at
-                        ).dt.tz_localize(None),
-                    )
-                )
-
-                data = pd.concat([data, page_data], axis=0)
-
-                fetched_repos += len(page_data)
-                pbar.update(len(page_data))
-
-                params["page"] += 1
-
-        return data
+            for page in paginate(url, headers=Token.headers()):
+                pages.append(page)
+                pbar.update(len(page))
+
+        # Project only the wanted fields into rows, then build the frame and parse
+        # the dates once for all pages. A repo created while the pages are fetched
+        # shifts the others, so one may appear on two pages; keep its first copy.
+        rows = [_repo_row(repo) for page in pages for repo in page]
+
+        return (
+            pd.DataFrame(rows, columns=_REPO_COLUMNS)
+            .drop_duplicates(subset="id", keep="first")
+            .set_index("id")
+            .assign(
+                created_at=lambda df_: pd.to_datetime(
+                    df_.created_at, utc=True
+                ).dt.tz_localize(None),
+                updated_at=lambda df_: pd.to_datetime(
+                    df_.updated_at, utc=True
+                ).dt.tz_localize(None),
+                pushed_at=lambda df_: pd.to_datetime(
+                    df_.pushed_at, utc=True
+                ).dt.tz_localize(None),
+            )
+        )
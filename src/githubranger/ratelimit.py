@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Throttle requests as GitHub's rate limit for a token nears exhaustion.
+
+    The state is taken from the X-RateLimit-Remaining and X-RateLimit-Reset headers
+    GitHub sends with every response. Once fewer than threshold requests remain, the
+    remaining ones are spread evenly until the limit resets instead of running into
+    403 responses.
+
+    Parameters
+    ----------
+    threshold : int, optional
+        Number of remaining requests below which requests are spaced out (default is
+        10).
+
+    """
+
+    def __init__(self, threshold=10):
+        self.threshold = threshold
+        self._state = {}  # token -> (remaining, reset timestamp)
+        self._next_at = {}  # token -> time the last throttled request was scheduled
+        self._lock = threading.Lock()
+
+    def update(self, token, headers):
+        """Record the rate-limit state reported in the headers of a response.
+
+        Parameters
+        ----------
+        token : str or None
+            Authorization header the request was sent with.
+        headers : Mapping
+            Response headers.
+
+        """
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is not None and reset is not None:
+            with self._lock:
+                self._state[token] = (int(remaining), float(reset))
+
+    def wait(self, token):
+        """Block before a request until it can be sent without hitting the limit.
+
+        Each throttled request is scheduled one interval after the previous one for
+        the same token, so concurrent threads are spaced out as well. Requests with
+        other tokens are not held up.
+
+        Parameters
+        ----------
+        token : str or None
+            Authorization header the request will be sent with.
+
+        """
+        with self._lock:
+            remaining, reset = self._state.get(token, (self.threshold, 0.0))
+            if remaining >= self.threshold:
+                return
+
+            now = time.time()
+            interval = max(0.0, reset - now) / max(remaining, 1)
+            send_at = max(now, self._next_at.get(token, 0.0)) + interval
+            # The limit is restored at the reset, so nothing waits beyond it.
+            send_at = min(send_at, max(now, reset))
+            self._next_at[token] = send_at
+
+        delay = send_at - now
+        if delay > 60:
+            logger.warning(
+                "GitHub API rate limit nearly exhausted (%d requests remaining), "
+                "waiting %.0f seconds.",
+                remaining,
+                delay,
+            )
+        time.sleep(delay)
+
+    @staticmethod
+    def retry_delay(response):
+        """Get how long to wait before retrying a rate-limited response.
+
+        Parameters
+        ----------
+        response : httpx.Response
+            Response to a request.
+
+        Returns
+        -------
+        float or None
+            Seconds to wait, or None if the response was not rate limited. For an
+            exhausted primary limit this is 0, as wait() holds the retry until reset.
+
+        """
+        if response.status_code not in (403, 429):
+            return None
+        elif (retry_after := response.headers.get("retry-after")) is not None:
+            return float(retry_after)
+        elif response.headers.get("x-ratelimit-remaining") == "0":
+            return 0.0
+        else:
+            return None
@@ -1,10 +1,25 @@
 import base64
+import concurrent.futures
+import functools
 import logging
-
-import requests
+import time
 
 from .token import Token
-from .util import get, post, put
+from .util import (
+    RequestRejectedError,
+    download,
+    get,
+    get_raw,
+    paginate,
+    post,
+    put,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds for which the result of exists() is reused, so that the checks made in quick
+# succession by one operation (e.g. ensure_repo_state) cost a single request.
+_EXISTS_TTL = 2.0
 
 
 class Repo:
@@ -23,6 +38,9 @@ class Repo:
         self.org = org
         self.name = name
         self.api_url = f"https://api.github.com/repos/{self.org.name}/{self.name}"
+        self._collaborators = None
+        self._exists = None
+        self._exists_at = 0.0
 
     def __repr__(self):
         """Return a string representation of the repository."""
@@ -43,18 +61,45 @@ class Repo:
     def exists(self):
         """Check if the GitHub repository exists.
 
+        The result is reused for two seconds, and create() records that the
+        repository exists.
+
         Returns
         -------
         bool
             True if the repository exists, False otherwise.
 
         """
-        url = self.api_url
-        try:
-            get(url, headers=Token.headers(), params=None)
-            return True
-        except ValueError:
-            return False
+        if self._exists is None or time.monotonic() - self._exists_at >= _EXISTS_TTL:
+            try:
+                get(self.api_url, headers=Token.headers(), params=None)
+                self._exists = True
+            except ValueError:
+                self._exists = False
+            self._exists_at = time.monotonic()
+
+        return self._exists
+
+    def collaborators(self):
+        """Get the logins of all users who can access the repository.
+
+        The result is cached and invalidated when a user is added with add_user().
+
+        Returns
+        -------
+        frozenset of str
+            Lower-cased logins of the repository collaborators.
+
+        """
+        if self._collaborators is None:
+            url = f"{self.api_url}/collaborators"
+            self._collaborators = frozenset(
+                collaborator["login"].lower()
+                for page in paginate(url, headers=Token.headers())
+                for collaborator in page
+            )
+
+        return self._collaborators
 
     def file_content(self, path, branch="main"):
         """Get the decoded content of a file from the repository.
@@ -71,18 +116,51 @@ class Repo:
         str or None
             Decoded file content, or None if not found or decoding fails.
 
+        Raises
+        ------
+        RuntimeError
+            For unexpected HTTP responses.
+
         """
-        url = f"{self.api_url}/contents/{path}?ref={branch}"
+        url = f"{self.api_url}/contents/{path}"
+        params = {"ref": branch}
 
-        if not (content := get(url, headers=Token.headers()).get("content")):
+        try:
+            content = get_raw(url, headers=Token.headers(), params=params)
+        except ValueError:
             return None
 
         try:
-            return base64.b64decode(content).decode("utf-8")
-        except (ValueError, TypeError):
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
             return None
 
-    def create(self, private=True, template=None):
+    def download(self, path, destination, branch="main"):
+        """Download a file from the repository to a local path.
+
+        The file is streamed to disk, so unlike file_content() it is never held in
+        memory as a whole and can be large or binary.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file in the repository.
+        destination : str or pathlib.Path
+            Local path to write the file to.
+        branch : str, optional
+            Branch name (default is "main").
+
+        Raises
+        ------
+        ValueError
+            If the file does not exist.
+
+        """
+        url = f"{self.api_url}/contents/{path}"
+        params = {"ref": branch}
+        download(url, destination, headers=Token.headers(), params=params)
+
+    def create(self, private=True, template=None, check_exists=True):
         """Create a new repository.
 
         Parameters
@@ -91,6 +169,10 @@ class Repo:
             Whether the repository should be private (default is True).
         template : Repo, optional
             A template repository to base the new repository on (default is None).
+        check_exists : bool, optional
+            Whether to check that the repository does not exist and the template does
+            before creating it (default is True). If False, the checks are skipped and
+            GitHub's rejection of the request is raised instead.
 
         Raises
         ------
@@ -98,13 +180,13 @@ class Repo:
             If the repository already exists or if the template does not exist.
 
         """
-        if self.exists():
+        if check_exists and self.exists():
             raise ValueError(
                 f"Repository '{self}' already exists in organization '{self.org}'."
             )
 
         if template is not None:
-            if not template.exists():
+            if check_exists and not template.exists():
                 raise ValueError(f"Template '{template}' does not exist.")
 
             url = f"{template.api_url}/generate"
@@ -121,25 +203,33 @@ class Repo:
             }
 
         response = post(url, headers=Token.headers(), json=data)
-        logging.info(f"Repository created at URL: {response['html_url']}")
+        self._exists, self._exists_at = True, time.monotonic()
+        logger.info("Repository created at URL: %s", response["html_url"])
 
-    def commit(self, path, content, message, branch="main"):
+    def commit(self, path, content, message, branch="main", sha=None):
         """Add or update a file in the repository.
 
         Parameters
         ----------
         path : str
             Path to the file in the repository.
-        content : str
-            Content of the file to be added or updated.
+        content : str or bytes
+            Content of the file to be added or updated. Text is encoded as UTF-8.
         message : str
             Commit message for the change.
         branch : str, optional
             Branch name (default is "main").
+        sha : str, optional
+            Blob SHA of the file being replaced. If None, the file is first assumed to
+            be new, and its SHA is only looked up if GitHub rejects the commit because
+            the file already exists.
 
         """
         url = f"{self.api_url}/contents/{path}"
-        base64_content = base64.b64encode(content.encode("utf-8")).decode("utf-8")
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        # Base64 output is pure ASCII, so the cheaper ASCII codec is sufficient.
+        base64_content = base64.b64encode(content).decode("ascii")
 
         data = {
             "message": message,
@@ -147,15 +237,26 @@ class Repo:
             "branch": branch,
         }
 
-        # Check if file exists to get its sha.
-        response = requests.get(url, headers=Token.headers(), params={"ref": branch})
-        if response.status_code == 200:
-            data["sha"] = response.json().get("sha")
-
-        put(url, headers=Token.headers(), json=data)
-        logging.info(f"Committed file '{path}' to repository '{self}'.")
+        if sha is not None:
+            data["sha"] = sha
 
-    def add_user(self, user, permission="push"):
+        try:
+            put(url, headers=Token.headers(), json=data)
+        except RequestRejectedError as e:
+            if sha is not None:
+                raise
+
+            # The file probably already exists, so its sha is required to update it.
+            # If it cannot be looked up, GitHub rejected the commit for another reason.
+            params = {"ref": branch}
+            try:
+                data["sha"] = get(url, headers=Token.headers(), params=params)["sha"]
+            except ValueError as lookup_error:
+                raise e from lookup_error
+            put(url, headers=Token.headers(), json=data)
+        logger.info("Committed file '%s' to repository '%s'.", path, self)
+
+    def add_user(self, user, permission="push", _checked=False):
         """Add a user as a collaborator to the repository.
 
         Parameters
@@ -164,14 +265,60 @@ class Repo:
             An instance of the User class representing the GitHub user.
         permission : str, optional
             Permission level for the user (default is "push").
+        _checked : bool, optional
+            Internal - skip the existence and access checks because the caller has
+            already made them (default is False).
 
         """
-        if not user.exists():
-            raise ValueError(f"User '{user}' does not exist.")
+        if not _checked:
+            if not user.exists():
+                raise ValueError(f"User '{user}' does not exist.")
+
+            if user.can_access(self):
+                raise ValueError(f"User '{user}' already can access repo '{self}'.")
 
-        if user.can_access(self):
-            raise ValueError(f"User '{user}' already can access repo '{self}'.")
         url = f"{self.api_url}/collaborators/{user.username}"
         data = {"permission": permission}
         put(url, headers=Token.headers(), json=data)
-        logging.info(f"Added user '{user}' to repo '{self}'.")
+        self._collaborators = None
+        user._forget_access(self)
+        logger.info("Added user '%s' to repo '%s'.", user, self)
+
+    def add_users(self, users, permission="push"):
+        """Add several users as collaborators to the repository.
+
+        The current collaborators are listed once rather than checked per user, and
+        the users who still need access are then added concurrently. Users who do not
+        exist or already have access are skipped with a warning.
+
+        Parameters
+        ----------
+        users : list of User
+            User instances representing the GitHub users to add.
+        permission : str, optional
+            Permission level for the users (default is "push").
+
+        """
+        collaborators = self.collaborators()
+
+        new_users = []
+        for user in users:
+            if user.username.lower() in collaborators:
+                logger.warning("User '%s' already has access to repo '%s'.", user, self)
+            else:
+                new_users.append(user)
+
+        if not new_users:
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+            add_new_user = functools.partial(self._add_new_user, permission=permission)
+            list(executor.map(add_new_user, new_users))
+
+    def _add_new_user(self, user, permission):
+        """Add a user who is known not to be a collaborator, if they exist."""
+        if not user.exists():
+            logger.warning("User '%s' does not exist.", user)
+            return
+
+        self.add_user(user, permission=permission, _checked=True)
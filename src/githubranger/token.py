@@ -1,6 +1,25 @@
 import datetime
+import functools
+import types
 
-from .util import get
+from .util import _RATE_LIMIT_URL, get
+
+
+@functools.lru_cache(maxsize=8)
+def _headers_for(token):
+    """Build the read-only request headers for token, once per token."""
+    return types.MappingProxyType(
+        (
+            {
+                "Authorization": f"token {token}",
+            }
+            if token
+            else {}
+        )
+        | {
+            "Accept": "application/vnd.github+json",
+        }
+    )
 
 
 class Token:
@@ -36,9 +55,11 @@ class Token:
     def headers(cls):
         """Get the headers for GitHub API requests using the token.
 
+        The headers are built once per token and shared, so they are read-only.
+
         Returns
         -------
-        dict
+        types.MappingProxyType
             Headers with the Authorization token.
 
         Raises
@@ -47,15 +68,7 @@ class Token:
             If the token is not set.
 
         """
-        return (
-            {
-                "Authorization": f"token {cls._token}",
-            }
-            if cls._token
-            else {}
-        ) | {
-            "Accept": "application/vnd.github+json",
-        }
+        return _headers_for(cls._token)
 
     @classmethod
     def _rate(cls):
@@ -70,7 +83,7 @@ class Token:
         if cls._token is None:
             raise RuntimeError("GitHub token not set. Use Token.set_token() first.")
 
-        url = "https://api.github.com/rate_limit"
+        url = _RATE_LIMIT_URL
         headers = {"Authorization": f"token {cls._token}"}
 
         return get(url, headers=headers, timeout=10)["rate"]
@@ -1,9 +1,13 @@
 import logging
-
-import requests
+import time
 
 from .token import Token
-from .util import get
+from .util import get, head
+
+logger = logging.getLogger(__name__)
+
+# Seconds for which the result of can_access() for a repository is reused.
+_ACCESS_TTL = 2.0
 
 
 class User:
@@ -18,6 +22,8 @@ class User:
     def __init__(self, username):
         self.username = username
         self.api_url = f"https://api.github.com/users/{self.username}"
+        self._exists_cache = None
+        self._access = {}  # repo API URL -> (can access, time.monotonic() of check)
 
     def __repr__(self):
         """Return a string representation of the user."""
@@ -26,21 +32,28 @@ class User:
     def exists(self):
         """Check if the GitHub user exists.
 
+        The result is memoized, so repeated checks for the same user are free.
+
         Returns
         -------
         bool
             True if the user exists, False otherwise.
         """
-        url = self.api_url
-        try:
-            get(url, headers=Token.headers())
-            return True
-        except ValueError:
-            return False
+        if self._exists_cache is None:
+            try:
+                get(self.api_url, headers=Token.headers())
+                self._exists_cache = True
+            except ValueError:
+                self._exists_cache = False
+
+        return self._exists_cache
 
     def can_access(self, repo):
         """Check if the user can access a specific repository.
 
+        The result is reused for two seconds, unless the user is added to the
+        repository with Repo.add_user() in the meantime.
+
         Parameters
         ----------
         repo : Repo
@@ -52,9 +65,19 @@ class User:
             True if the user can access the repository, False otherwise.
         """
         if not self.exists():
-            logging.warning(f"'{self}' does not exist.")
+            logger.warning("'%s' does not exist.", self)
             return False
 
+        cached = self._access.get(repo.api_url)
+        if cached is not None and time.monotonic() - cached[1] < _ACCESS_TTL:
+            return cached[0]
+
         url = f"{repo.api_url}/collaborators/{self.username}"
-        response = requests.get(url, headers=Token.headers())  # to allow 404 responses
-        return response.status_code == 204
+        # HEAD returns the same 204/404 status without a body.
+        can_access = head(url, headers=Token.headers()) == 204
+        self._access[repo.api_url] = (can_access, time.monotonic())
+        return can_access
+
+    def _forget_access(self, repo):
+        """Discard the cached result of can_access() for repo."""
+        self._access.pop(repo.api_url, None)
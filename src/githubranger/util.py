@@ -1,12 +1,386 @@
-import inspect
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import json
+import pathlib
+import sqlite3
+import sys
+import threading
+import time
+import types
 
-import requests
+import httpx
+
+from .ratelimit import RateLimiter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON bodies are parsed and serialized with orjson when it is installed (the "fast"
+# extra), falling back to the standard library otherwise.
+if orjson is not None:
+    _loads, _dumps = orjson.loads, orjson.dumps
+else:
+    _loads = json.loads
+
+    def _dumps(obj):
+        """Serialize obj to compact JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+class RequestRejectedError(ValueError):
+    """GitHub rejected a request as invalid (422 Unprocessable Entity)."""
+
+
+_RETRY_METHODS = frozenset({"GET", "HEAD", "PUT"})
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_MAX_RETRIES = 5
+_BACKOFF_FACTOR = 0.5
+_RATE_LIMITER = RateLimiter()
+# Requests to this endpoint do not count against the rate limit, so they are never
+# throttled; otherwise the limit could not be checked while it is nearly exhausted.
+_RATE_LIMIT_URL = "https://api.github.com/rate_limit"
+# Maximum number of pages of a list endpoint that are requested concurrently.
+_MAX_WORKERS = 10
+
+
+@functools.cache
+def _client():
+    """Return the HTTP client shared by all requests, creating it on first use.
+
+    All requests go to api.github.com, so HTTP/2 multiplexes them, including
+    concurrent ones, over a single connection with a single TLS handshake. The
+    connection limits only matter if a proxy forces HTTP/1.1; they are set high
+    enough that the thread pools never wait for a free connection.
+
+    """
+    return httpx.Client(
+        http2=True,
+        timeout=10,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+
+
+def _send(method, url, stream=False, **kwargs):
+    """Send a request, waiting out rate limits and retrying gateway errors.
+
+    Requests rejected by a rate limit are retried once it allows, honouring any
+    Retry-After header. Idempotent requests that hit a gateway error are retried with
+    exponential back-off. If stream is True, the body of the returned response is not
+    read yet and the caller has to close it.
+
+    """
+    token = (kwargs.get("headers") or {}).get("Authorization")
+    for attempt in range(_MAX_RETRIES + 1):
+        if url != _RATE_LIMIT_URL:
+            _RATE_LIMITER.wait(token)
+        client = _client()
+        request = client.build_request(method, url, **kwargs)
+        response = client.send(request, stream=stream)
+        _RATE_LIMITER.update(token, response.headers)
+
+        if attempt == _MAX_RETRIES:
+            break
+        elif (delay := _RATE_LIMITER.retry_delay(response)) is not None:
+            response.close()
+            time.sleep(delay)
+        elif method in _RETRY_METHODS and response.status_code in _RETRY_STATUSES:
+            response.close()
+            time.sleep(_BACKOFF_FACTOR * 2**attempt)
+        else:
+            break
+
+    return response
+
+
+def close_session():
+    """Close the shared HTTP client and release its connections.
+
+    A new client is created on demand by the next request.
+
+    """
+    if _client.cache_info().currsize:
+        _client().close()
+        _client.cache_clear()
+
+
+@contextlib.contextmanager
+def session():
+    """Reuse one HTTP connection for a block of API calls and close it afterwards.
+
+    All calls share a single client anyway; this context manager only guarantees that
+    its connections are released when the block exits, e.g. in test teardown or at
+    the end of a script.
+
+    """
+    try:
+        yield
+    finally:
+        close_session()
+
+
+class _EtagCache:
+    """ETags, bodies and Link URLs of previous GET responses, keyed by _cache_key().
+
+    A conditional request answered with 304 Not Modified does not count against the
+    rate limit. Entries are kept in a bounded in-memory LRU and, once attach() has
+    been called, also in an SQLite database so that they survive between processes.
+    Bodies are kept as the bytes received, so that no caller can modify them.
+
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def attach(self, path):
+        """Persist entries in the SQLite database at path."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache (url TEXT, params TEXT, etag TEXT, "
+            "body BLOB, links TEXT, PRIMARY KEY (url, params))"
+        )
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+            self._db = db
+
+    def lookup(self, key):
+        """Return the cached (etag, body, links) entry for key, or None."""
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT etag, body, links FROM cache WHERE url = ? AND params = ?",
+                    (key[0], _params_json(key)),
+                ).fetchone()
+                if row is not None:
+                    etag, body, links = row
+                    entry = (etag, body, json.loads(links))
+                    self._remember(key, entry)
+            return entry
+
+    def store(self, key, entry):
+        """Cache the (etag, body, links) entry for key."""
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                etag, body, links = entry
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                    (
+                        key[0],
+                        _params_json(key),
+                        etag,
+                        body,
+                        json.dumps(links),
+                    ),
+                )
+
+    def _remember(self, key, entry):
+        """Keep entry in memory, evicting the least recently used one if full."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _cache_key(url, headers, params):
+    """Return the key identifying a GET request for caching and coalescing.
+
+    The Accept header is part of the key because it selects the representation.
+
+    """
+    return url, frozenset((params or {}).items()), (headers or {}).get("Accept")
+
+
+def _params_json(key):
+    """Serialize the URL parameters and Accept header of a key in a stable order."""
+    return json.dumps([sorted(key[1]), key[2]])
+
+
+_ETAG_CACHE = _EtagCache(maxsize=4096)
+
+
+def enable_disk_cache(path=None):
+    """Keep the ETag cache in an SQLite database as well as in memory.
+
+    Conditional requests then hit the cache across processes, e.g. in scheduled jobs
+    that repeatedly run ensure_repo_state. Cached response bodies are written to the
+    database, so only enable this where the data may be stored on disk.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path, optional
+        Path of the SQLite database. If None, ~/.cache/githubranger/etag.sqlite is
+        used.
+
+    """
+    if path is None:
+        path = pathlib.Path.home() / ".cache" / "githubranger" / "etag.sqlite"
+
+    _ETAG_CACHE.attach(pathlib.Path(path))
+
+
+# Statuses that each method treats as success; anything else raises.
+_SUCCESS = {
+    "GET": frozenset({200, 204, 304}),
+    "POST": frozenset({200, 201, 204}),
+    "PUT": frozenset({200, 201, 204}),
+}
+
+
+@contextlib.contextmanager
+def _translate_errors(context):
+    """Raise errors of the HTTP client as the exceptions documented for this module.
+
+    context is the name of the calling function, used in error messages.
+
+    """
+    try:
+        yield
+    except httpx.TimeoutException:
+        raise ConnectionError(f"Request timed out in {context}().")
+    except httpx.NetworkError:
+        raise ConnectionError(f"Network connection error in {context}().")
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"Error in {context}(): {e}")
+
+
+def _request(method, url, context, stream=False, **kwargs):
+    """Send a request and return the response, raising for unsuccessful statuses.
+
+    context is the name of the calling function, used in error messages. If stream is
+    True, the body of a successful response is left unread for the caller.
+
+    """
+    if (body := kwargs.pop("json", None)) is not None:
+        kwargs["content"] = _dumps(body)
+        kwargs["headers"] = (kwargs.get("headers") or {}) | {
+            "Content-Type": "application/json"
+        }
+
+    with _translate_errors(context):
+        response = _send(method, url, stream=stream, **kwargs)
+        code = response.status_code
+        if code in _SUCCESS[method]:
+            return response
+        # Error messages include the body, which a streamed response has not read.
+        response.read()
+
+    if code == 404:
+        raise ValueError(f"Resource not found in {context}().")
+    elif code == 422 and method != "GET":
+        # Only writes are rejected as invalid; for reads, ValueError means not found.
+        raise RequestRejectedError(f"Request rejected in {context}(): {response.text}")
+    elif code == 403 and response.headers.get("x-ratelimit-remaining") == "0":
+        raise RuntimeError("GitHub API rate limit exceeded.")
+    else:
+        raise RuntimeError(
+            f"Unexpected response ({code}) in {context}(): {response.text}"
+        )
+
+
+# Shared, read-only result for responses without a body.
+_NO_CONTENT = types.MappingProxyType({"status_code": 204})
+
+
+def _decode(content, context):
+    """Parse the JSON body of a successful response, which is empty for 204."""
+    if not content:
+        return _NO_CONTENT
+
+    try:
+        return _loads(content)
+    except ValueError:
+        raise RuntimeError(f"Failed to parse JSON in {context}().")
+
+
+# Media type under which GitHub returns file contents as-is rather than as JSON.
+_RAW_MEDIA_TYPE = "application/vnd.github.raw+json"
+
+# Size of the chunks in which downloads are written to disk.
+_CHUNK_SIZE = 64 * 1024
+
+# Largest raw file body kept in the ETag cache. The cache is bounded by entries, not
+# bytes, so larger files are not cached and are downloaded in full every time.
+_MAX_CACHED_RAW_SIZE = 256 * 1024
+
+# GET requests currently in flight, so that identical concurrent requests (e.g. from
+# the thread pools) share a single network call.
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _get(url, headers, params, timeout, context):
+    """Make a GET request and return the body as bytes and the Link URLs.
+
+    If an identical request with the same token is already in flight, wait for its
+    result instead. Requests with different tokens are never shared, since tokens
+    may see different data. Callers parse the body themselves, so each gets its own
+    copy of the result.
+
+    """
+    key = _cache_key(url, headers, params), (headers or {}).get("Authorization")
+    with _INFLIGHT_LOCK:
+        leader = (future := _INFLIGHT.get(key)) is None
+        if leader:
+            future = _INFLIGHT[key] = concurrent.futures.Future()
+
+    if not leader:
+        return future.result()
+
+    try:
+        result = _conditional_get(url, headers, params, timeout, context)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
+
+
+def _conditional_get(url, headers, params, timeout, context):
+    """Make a GET request, revalidating any cached response with its ETag."""
+    key = _cache_key(url, headers, params)
+    if (cached := _ETAG_CACHE.lookup(key)) is not None:
+        headers = (headers or {}) | {"If-None-Match": cached[0]}
+
+    response = _request(
+        "GET", url, context, headers=headers, params=params, timeout=timeout
+    )
+    if response.status_code == 304 and cached is not None:
+        return cached[1], cached[2]
+
+    body = response.content
+    cacheable = response.status_code == 200
+    if (headers or {}).get("Accept") == _RAW_MEDIA_TYPE:
+        cacheable = cacheable and len(body) <= _MAX_CACHED_RAW_SIZE
+    links = {rel: link["url"] for rel, link in response.links.items()}
+    if cacheable and (etag := response.headers.get("etag")):
+        _ETAG_CACHE.store(key, (etag, body, links))
+    return body, links
 
 
 def get(url, headers=None, params=None, timeout=10):
     """
     Make a GET request.
 
+    Responses carrying an ETag are cached, and repeated requests for the same URL and
+    parameters are made conditional, so unchanged resources are served from the cache.
+    Every call parses its own copy of the body, so the result may be modified.
+
     Parameters
     ----------
     url : str
@@ -33,36 +407,230 @@ def get(url, headers=None, params=None, timeout=10):
         If the resource is not found (404).
 
     """
-    context = inspect.stack()[1].function
+    context = sys._getframe(1).f_code.co_name
+    return _decode(_get(url, headers, params, timeout, context)[0], context)
+
+
+def get_raw(url, headers=None, params=None, timeout=10):
+    """
+    Make a GET request for the raw content of a file.
+
+    The request uses GitHub's raw media type, so the file is returned as-is instead of
+    base64-encoded in JSON. As with get(), responses are cached by ETag, but only for
+    files of up to 256 KiB; larger ones are downloaded in full on every call.
+
+    Parameters
+    ----------
+    url : str
+        The URL to request.
+    headers : dict, optional
+        Additional headers to include in the request.
+    params : dict, optional
+        URL parameters to pass with the request.
+    timeout : int, optional
+        Request timeout in seconds.
+
+    Returns
+    -------
+    bytes
+        Content of the file.
+
+    Raises
+    ------
+    ConnectionError
+        For network issues.
+    RuntimeError
+        For unexpected HTTP responses.
+    ValueError
+        If the resource is not found (404).
+
+    """
+    context = sys._getframe(1).f_code.co_name
+    headers = (headers or {}) | {"Accept": _RAW_MEDIA_TYPE}
+    return _get(url, headers, params, timeout, context)[0]
+
+
+def get_page(url, headers=None, params=None, timeout=10):
+    """
+    Make a GET request to a paginated endpoint.
+
+    Same as get(), but also returns the pagination URLs from the Link header.
+
+    Parameters
+    ----------
+    url : str
+        The URL to request.
+    headers : dict, optional
+        Additional headers to include in the request.
+    params : dict, optional
+        URL parameters to pass with the request.
+    timeout : int, optional
+        Request timeout in seconds.
+
+    Returns
+    -------
+    tuple
+        Parsed JSON response and a dict mapping Link relations ("next", "last", ...)
+        to their URLs.
+
+    Raises
+    ------
+    ConnectionError
+        For network issues.
+    RuntimeError
+        For unexpected HTTP responses or JSON decode errors.
+    ValueError
+        If the resource is not found (404).
+
+    """
+    context = sys._getframe(1).f_code.co_name
+    content, links = _get(url, headers, params, timeout, context)
+    return _decode(content, context), dict(links)
+
+
+def download(url, destination, headers=None, params=None, timeout=10):
+    """
+    Download the raw content of a file to a local path.
+
+    Unlike get_raw(), the content is streamed to disk in chunks rather than held in
+    memory, so large files can be downloaded. Downloads are not cached.
+
+    Parameters
+    ----------
+    url : str
+        The URL to request.
+    destination : str or pathlib.Path
+        Local path to write the file to. It is only created once the request succeeds.
+    headers : dict, optional
+        Additional headers to include in the request.
+    params : dict, optional
+        URL parameters to pass with the request.
+    timeout : int, optional
+        Request timeout in seconds.
+
+    Raises
+    ------
+    ConnectionError
+        For network issues.
+    RuntimeError
+        For unexpected HTTP responses.
+    ValueError
+        If the resource is not found (404).
+
+    """
+    context = sys._getframe(1).f_code.co_name
+    headers = (headers or {}) | {"Accept": _RAW_MEDIA_TYPE}
+    response = _request(
+        "GET",
+        url,
+        context,
+        stream=True,
+        headers=headers,
+        params=params,
+        timeout=timeout,
+    )
+    try:
+        with _translate_errors(context), open(destination, "wb") as f:
+            for chunk in response.iter_bytes(_CHUNK_SIZE):
+                f.write(chunk)
+    finally:
+        response.close()
 
+
+def _page_number(url):
+    """Return the page number in the query of a pagination URL, or None."""
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=timeout)
-    except requests.exceptions.Timeout:
-        raise ConnectionError(f"Request timed out in {context}().")
-    except requests.exceptions.ConnectionError:
-        raise ConnectionError(f"Network connection error in {context}().")
-    except requests.RequestException as e:
-        raise RuntimeError(f"Error in {context}(): {e}")
+        return int(httpx.URL(url).params["page"])
+    except (KeyError, TypeError, ValueError):
+        return None
 
-    if response.status_code == 204:
-        return {"status_code": 204}
-    elif response.status_code == 200:
+
+def paginate(url, headers=None, params=None, per_page=100):
+    """
+    Iterate over the pages of a GitHub list endpoint.
+
+    The first page is requested on its own. If its Link header gives the number of the
+    last page, the remaining pages are then requested concurrently; otherwise they are
+    followed one by one through the "next" URL. Either way, pages are yielded in order
+    and iteration stops at the last page without requesting an empty one.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the list endpoint.
+    headers : dict, optional
+        Additional headers to include in the requests.
+    params : dict, optional
+        URL parameters to pass with the requests.
+    per_page : int, optional
+        Number of items per page (default and GitHub maximum is 100).
+
+    Yields
+    ------
+    list
+        Parsed JSON items of each page.
+
+    """
+    context = sys._getframe(1).f_code.co_name
+
+    params = (params or {}) | {"per_page": per_page}
+    content, links = _get(url, headers, params, 10, context)
+    if page := _decode(content, context):
+        yield page
+
+    if (last_page := _page_number(links.get("last"))) is not None:
+
+        def fetch_page(number):
+            return _get(url, headers, params | {"page": number}, 10, context)
+
+        executor = concurrent.futures.ThreadPoolExecutor(_MAX_WORKERS)
         try:
-            return response.json()
-        except ValueError:
-            raise RuntimeError(f"Failed to parse JSON in {context}().")
-    elif response.status_code == 404:
-        raise ValueError(f"Resource not found in {context}().")
-    elif (
-        response.status_code == 403
-        and response.headers.get("X-RateLimit-Remaining") == "0"
-    ):
-        raise RuntimeError("GitHub API rate limit exceeded.")
-    else:
-        raise RuntimeError(
-            f"Unexpected response ({response.status_code}) in {context}(): "
-            f"{response.text}"
-        )
+            for content, links in executor.map(fetch_page, range(2, last_page + 1)):
+                if page := _decode(content, context):
+                    yield page
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    # Follow the Link header for any pages beyond the last one announced, e.g. if
+    # items were added meanwhile. The next URL already carries all query parameters.
+    while (next_url := links.get("next")) is not None:
+        content, links = _get(next_url, headers, None, 10, context)
+        if page := _decode(content, context):
+            yield page
+
+
+def head(url, headers=None, timeout=10):
+    """
+    Make a HEAD request and return its status code.
+
+    Unlike the other functions, this does not raise for unsuccessful statuses: HEAD
+    is used to probe whether a resource exists, which the status alone answers.
+
+    Parameters
+    ----------
+    url : str
+        The URL to request.
+    headers : dict, optional
+        Additional headers to include in the request.
+    timeout : int, optional
+        Request timeout in seconds.
+
+    Returns
+    -------
+    int
+        HTTP status code of the response.
+
+    Raises
+    ------
+    ConnectionError
+        For network issues.
+    RuntimeError
+        For other errors of the HTTP client.
+
+    """
+    context = sys._getframe(1).f_code.co_name
+    with _translate_errors(context):
+        return _send("HEAD", url, headers=headers, timeout=timeout).status_code
 
 
 def post(url, headers=None, data=None, json=None, timeout=10):
@@ -94,41 +662,14 @@ def post(url, headers=None, data=None, json=None, timeout=10):
     RuntimeError
         For unexpected HTTP responses or JSON decode errors.
     ValueError
-        If the resource is not found (404).
+        If the resource is not found (404) or the request is rejected (422).
 
     """
-    context = inspect.stack()[1].function
-
-    try:
-        response = requests.post(
-            url, headers=headers, data=data, json=json, timeout=timeout
-        )
-    except requests.exceptions.Timeout:
-        raise ConnectionError(f"Request timed out in {context}().")
-    except requests.exceptions.ConnectionError:
-        raise ConnectionError(f"Network connection error in {context}().")
-    except requests.RequestException as e:
-        raise RuntimeError(f"Error in {context}(): {e}")
-
-    if response.status_code in (200, 201):
-        try:
-            return response.json()
-        except ValueError:
-            raise RuntimeError(f"Failed to parse JSON in {context}().")
-    elif response.status_code == 204:
-        return {"status_code": 204}
-    elif response.status_code == 404:
-        raise ValueError(f"Resource not found in {context}().")
-    elif (
-        response.status_code == 403
-        and response.headers.get("X-RateLimit-Remaining") == "0"
-    ):
-        raise RuntimeError("GitHub API rate limit exceeded.")
-    else:
-        raise RuntimeError(
-            f"Unexpected response ({response.status_code}) in {context}(): "
-            f"{response.text}"
-        )
+    context = sys._getframe(1).f_code.co_name
+    response = _request(
+        "POST", url, context, headers=headers, data=data, json=json, timeout=timeout
+    )
+    return _decode(response.content, context)
 
 
 def put(url, headers=None, data=None, json=None, timeout=10):
@@ -160,38 +701,11 @@ def put(url, headers=None, data=None, json=None, timeout=10):
     RuntimeError
         For unexpected HTTP responses or JSON decode errors.
     ValueError
-        If the resource is not found (404).
+        If the resource is not found (404) or the request is rejected (422).
 
     """
-    context = inspect.stack()[1].function
-
-    try:
-        response = requests.put(
-            url, headers=headers, data=data, json=json, timeout=timeout
-        )
-    except requests.exceptions.Timeout:
-        raise ConnectionError(f"Request timed out in {context}().")
-    except requests.exceptions.ConnectionError:
-        raise ConnectionError(f"Network connection error in {context}().")
-    except requests.RequestException as e:
-        raise RuntimeError(f"Error in {context}(): {e}")
-
-    if response.status_code in (200, 201):
-        try:
-            return response.json()
-        except ValueError:
-            raise RuntimeError(f"Failed to parse JSON in {context}().")
-    elif response.status_code == 204:
-        return {"status_code": 204}
-    elif response.status_code == 404:
-        raise ValueError(f"Resource not found in {context}().")
-    elif (
-        response.status_code == 403
-        and response.headers.get("X-RateLimit-Remaining") == "0"
-    ):
-        raise RuntimeError("GitHub API rate limit exceeded.")
-    else:
-        raise RuntimeError(
-            f"Unexpected response ({response.status_code}) in {context}(): "
-            f"{response.text}"
-        )
+    context = sys._getframe(1).f_code.co_name
+    response = _request(
+        "PUT", url, context, headers=headers, data=data, json=json, timeout=timeout
+    )
+    return _decode(response.content, context)
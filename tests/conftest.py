@@ -0,0 +1,34 @@
+import httpx
+import pytest
+
+from githubranger import util
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """Route API requests to a handler instead of the network.
+
+    The fixture is a function that installs a handler, which maps an httpx.Request
+    to an httpx.Response, and returns the list in which the requests are recorded.
+    The caches and the rate limiter are fresh for every test.
+
+    """
+    monkeypatch.setattr(util, "_ETAG_CACHE", util._EtagCache(maxsize=16))
+    monkeypatch.setattr(util, "_RATE_LIMITER", util.RateLimiter())
+    monkeypatch.setattr(util, "_INFLIGHT", {})
+
+    def install(handler):
+        requests = []
+
+        def record(request):
+            requests.append(request)
+            return handler(request)
+
+        client = httpx.Client(transport=httpx.MockTransport(record))
+        monkeypatch.setattr(util, "_client", lambda: client)
+        return requests
+
+    yield install
+
+    if util._ETAG_CACHE._db is not None:
+        util._ETAG_CACHE._db.close()
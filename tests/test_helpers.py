@@ -0,0 +1,62 @@
+import httpx
+import pytest
+
+import githubranger as gr
+
+
+def make_repo(name="test_repo"):
+    return gr.Repo(gr.Org("test_org"), name)
+
+
+def api_handler(existing_repos, collaborators=()):
+    """Serve an org with the given repos, whose collaborators are the given logins."""
+
+    def handler(request):
+        path = request.url.path
+        if request.method == "POST":
+            return httpx.Response(201, json={"html_url": "https://github.com/new"})
+        if request.method == "PUT":
+            return httpx.Response(201, json={})
+        if path.startswith("/users/"):
+            return httpx.Response(200, json={})
+        if path.endswith("/collaborators"):
+            return httpx.Response(200, json=[{"login": c} for c in collaborators])
+        name = path.removeprefix("/repos/test_org/")
+        return httpx.Response(200 if name in existing_repos else 404, json={})
+
+    return handler
+
+
+class TestEnsureRepoState:
+    def test_creates_missing_repo(self, mock_api):
+        requests = mock_api(api_handler(existing_repos=set()))
+
+        gr.ensure_repo_state(make_repo())
+
+        posts = [r.url.path for r in requests if r.method == "POST"]
+        assert posts == ["/orgs/test_org/repos"]
+
+    def test_creates_repo_from_template(self, mock_api):
+        requests = mock_api(api_handler(existing_repos={"template"}))
+
+        gr.ensure_repo_state(make_repo(), template=make_repo("template"))
+
+        posts = [r.url.path for r in requests if r.method == "POST"]
+        assert posts == ["/repos/test_org/template/generate"]
+
+    def test_missing_template(self, mock_api):
+        requests = mock_api(api_handler(existing_repos=set()))
+
+        with pytest.raises(ValueError, match="Template"):
+            gr.ensure_repo_state(make_repo(), template=make_repo("template"))
+        assert all(r.method == "GET" for r in requests)
+
+    def test_adds_only_new_collaborators(self, mock_api):
+        requests = mock_api(
+            api_handler(existing_repos={"test_repo"}, collaborators=["Alice"])
+        )
+
+        gr.ensure_repo_state(make_repo(), users=[gr.User("alice"), gr.User("bob")])
+
+        writes = [(r.method, r.url.path) for r in requests if r.method != "GET"]
+        assert writes == [("PUT", "/repos/test_org/test_repo/collaborators/bob")]
@@ -1,5 +1,49 @@
+import httpx
+import pandas as pd
+
 import githubranger as gr
 
+REPOS_URL = "https://api.github.com/orgs/test_org/repos"
+
+
+def repo_json(repo_id):
+    return {
+        "id": repo_id,
+        "name": f"repo{repo_id}",
+        "full_name": f"test_org/repo{repo_id}",
+        "description": None,
+        "private": True,
+        "is_template": False,
+        "url": "",
+        "html_url": "",
+        "clone_url": "",
+        "fork": False,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-02T00:00:00Z",
+        "pushed_at": None,
+        "default_branch": "main",
+        "size": 0,
+        "archived": False,
+    }
+
+
+def repos_handler(pages):
+    """Serve the given pages of repo ids from the org's repos endpoint."""
+
+    def handler(request):
+        if request.url.path == "/orgs/test_org":
+            n_repos = sum(len(page) for page in pages)
+            return httpx.Response(200, json={"public_repos": n_repos})
+
+        number = int(request.url.params.get("page", 1))
+        links = [f'<{REPOS_URL}?per_page=100&page={len(pages)}>; rel="last"']
+        if number < len(pages):
+            links.append(f'<{REPOS_URL}?per_page=100&page={number + 1}>; rel="next"')
+        body = [repo_json(repo_id) for repo_id in pages[number - 1]]
+        return httpx.Response(200, json=body, headers={"Link": ", ".join(links)})
+
+    return handler
+
 
 class TestOrg:
     def test_init(self):
@@ -9,3 +53,27 @@ class TestOrg:
     def test_repr(self):
         org = gr.Org(name="test_org")
         assert repr(org) == "Org(name='test_org')"
+
+    def test_repos_from_several_pages(self, mock_api):
+        mock_api(repos_handler([range(100), range(100, 200), range(200, 250)]))
+
+        df = gr.Org("test_org").repos()
+
+        assert list(df.index) == list(range(250))
+        assert pd.api.types.is_datetime64_dtype(df.created_at)
+
+    def test_repos_duplicated_across_pages(self, mock_api):
+        # A repo created during the fetch shifts repo 99 from page 1 to page 2.
+        mock_api(repos_handler([range(100), range(99, 199)]))
+
+        df = gr.Org("test_org").repos()
+
+        assert list(df.index) == list(range(199))
+
+    def test_repos_of_empty_org(self, mock_api):
+        mock_api(repos_handler([[]]))
+
+        df = gr.Org("test_org").repos()
+
+        assert df.empty
+        assert "name" in df.columns
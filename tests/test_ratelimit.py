@@ -0,0 +1,63 @@
+import threading
+import time
+
+import httpx
+
+from githubranger.ratelimit import RateLimiter
+
+
+class TestRateLimiter:
+    def test_wait_without_state(self):
+        limiter = RateLimiter()
+        start = time.monotonic()
+        limiter.wait("token abc")
+        assert time.monotonic() - start < 0.1
+
+    def test_wait_spaces_out_remaining_requests(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+
+        limiter = RateLimiter(threshold=10)
+        reset = time.time() + 50
+        limiter.update(
+            "token abc", {"x-ratelimit-remaining": "5", "x-ratelimit-reset": str(reset)}
+        )
+        limiter.wait("token abc")
+        limiter.wait("token abc")
+
+        assert len(sleeps) == 2
+        assert 9 < sleeps[0] <= 10
+        assert 19 < sleeps[1] <= 20
+
+    def test_wait_does_not_block_other_tokens(self):
+        limiter = RateLimiter()
+        reset = time.time() + 1
+        limiter.update(
+            "token abc", {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(reset)}
+        )
+
+        throttled = threading.Thread(target=limiter.wait, args=("token abc",))
+        throttled.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        limiter.wait("token xyz")
+        assert time.monotonic() - start < 0.1
+        assert throttled.is_alive()
+
+        throttled.join()
+        assert time.time() >= reset - 0.05
+
+    def test_retry_delay(self):
+        assert RateLimiter.retry_delay(httpx.Response(200)) is None
+        assert RateLimiter.retry_delay(httpx.Response(403)) is None
+        assert (
+            RateLimiter.retry_delay(httpx.Response(429, headers={"Retry-After": "3"}))
+            == 3
+        )
+        assert (
+            RateLimiter.retry_delay(
+                httpx.Response(403, headers={"X-RateLimit-Remaining": "0"})
+            )
+            == 0
+        )
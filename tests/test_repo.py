@@ -0,0 +1,117 @@
+import json
+
+import httpx
+import pytest
+
+import githubranger as gr
+
+
+def make_repo():
+    return gr.Repo(gr.Org("test_org"), "test_repo")
+
+
+class TestRepo:
+    def test_exists_is_reused_after_create(self, mock_api):
+        def handler(request):
+            if request.method == "POST":
+                return httpx.Response(201, json={"html_url": ""})
+            return httpx.Response(404, json={})
+
+        requests = mock_api(handler)
+        repo = make_repo()
+
+        assert not repo.exists()
+        assert not repo.exists()
+        repo.create(check_exists=False)
+        assert repo.exists()
+        assert [r.method for r in requests] == ["GET", "POST"]
+
+    def test_file_content(self, mock_api):
+        def handler(request):
+            if request.url.path.endswith("/missing.md"):
+                return httpx.Response(404, json={})
+            return httpx.Response(200, content="héllo".encode())
+
+        requests = mock_api(handler)
+        repo = make_repo()
+
+        assert repo.file_content("README.md", branch="dev") == "héllo"
+        assert repo.file_content("missing.md") is None
+        assert requests[0].headers["Accept"] == "application/vnd.github.raw+json"
+        assert requests[0].url.params["ref"] == "dev"
+
+    def test_commit_new_file(self, mock_api):
+        requests = mock_api(lambda request: httpx.Response(201, json={}))
+
+        make_repo().commit("README.md", "hello", "Add README")
+
+        assert [r.method for r in requests] == ["PUT"]
+        assert "sha" not in json.loads(requests[0].content)
+
+    def test_commit_existing_file_retries_with_sha(self, mock_api):
+        def handler(request):
+            if request.method == "GET":
+                return httpx.Response(200, json={"sha": "abc123"})
+            if "sha" not in json.loads(request.content):
+                return httpx.Response(422, json={"message": '"sha" wasn\'t supplied.'})
+            return httpx.Response(200, json={})
+
+        requests = mock_api(handler)
+
+        make_repo().commit("README.md", b"hello", "Update README")
+
+        assert [r.method for r in requests] == ["PUT", "GET", "PUT"]
+        assert json.loads(requests[2].content)["sha"] == "abc123"
+
+    def test_commit_rejected_for_other_reason(self, mock_api):
+        def handler(request):
+            if request.method == "GET":
+                return httpx.Response(404, json={})
+            return httpx.Response(422, json={"message": "Invalid branch name"})
+
+        mock_api(handler)
+
+        with pytest.raises(ValueError, match="Invalid branch name"):
+            make_repo().commit("README.md", "hello", "Add README", branch="b@d")
+
+    def test_commit_to_missing_repo(self, mock_api):
+        requests = mock_api(lambda request: httpx.Response(404, json={}))
+
+        with pytest.raises(ValueError, match="not found"):
+            make_repo().commit("README.md", "hello", "Add README")
+        assert [r.method for r in requests] == ["PUT"]
+
+    def test_add_users_only_adds_missing_collaborators(self, mock_api):
+        def handler(request):
+            path = request.url.path
+            if path.endswith("/collaborators"):
+                return httpx.Response(200, json=[{"login": "Alice"}])
+            if path == "/users/ghost":
+                return httpx.Response(404, json={})
+            if path.startswith("/users/"):
+                return httpx.Response(200, json={})
+            return httpx.Response(201, json={})
+
+        requests = mock_api(handler)
+        users = [gr.User("alice"), gr.User("bob"), gr.User("ghost")]
+
+        make_repo().add_users(users)
+
+        puts = [r.url.path for r in requests if r.method == "PUT"]
+        assert puts == ["/repos/test_org/test_repo/collaborators/bob"]
+
+    def test_download(self, mock_api, tmp_path):
+        def handler(request):
+            if request.url.path.endswith("/missing.bin"):
+                return httpx.Response(404, json={})
+            return httpx.Response(200, content=b"\x00\x01" * 100_000)
+
+        mock_api(handler)
+        repo = make_repo()
+
+        repo.download("data.bin", tmp_path / "data.bin")
+        assert (tmp_path / "data.bin").read_bytes() == b"\x00\x01" * 100_000
+
+        with pytest.raises(ValueError):
+            repo.download("missing.bin", tmp_path / "missing.bin")
+        assert not (tmp_path / "missing.bin").exists()
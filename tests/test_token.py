@@ -0,0 +1,17 @@
+import githubranger as gr
+
+
+class TestToken:
+    def teardown_method(self):
+        gr.Token.set_token(None)
+
+    def test_headers_without_token(self):
+        gr.Token.set_token(None)
+        assert gr.Token.headers() == {"Accept": "application/vnd.github+json"}
+
+    def test_headers_follow_token(self):
+        gr.Token.set_token("abc")
+        assert gr.Token.headers()["Authorization"] == "token abc"
+
+        gr.Token.set_token("xyz")
+        assert gr.Token.headers()["Authorization"] == "token xyz"
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+
+import githubranger as gr
+from githubranger import user as user_module
+
+
+def make_repo():
+    return gr.Repo(gr.Org("test_org"), "test_repo")
+
+
+def access_handler(collaborators):
+    def handler(request):
+        if request.url.path.startswith("/users/"):
+            return httpx.Response(200, json={})
+        username = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(204 if username in collaborators else 404)
+
+    return handler
+
+
+class TestUser:
+    def test_can_access_probes_with_head(self, mock_api):
+        requests = mock_api(access_handler({"alice"}))
+
+        assert gr.User("alice").can_access(make_repo())
+        assert not gr.User("bob").can_access(make_repo())
+        assert [r.method for r in requests if "collaborators" in r.url.path] == [
+            "HEAD",
+            "HEAD",
+        ]
+
+    def test_can_access_network_error(self, mock_api):
+        def handler(request):
+            if request.method == "HEAD":
+                raise httpx.ConnectError("Connection refused", request=request)
+            return httpx.Response(200, json={})
+
+        mock_api(handler)
+
+        with pytest.raises(ConnectionError):
+            gr.User("alice").can_access(make_repo())
+
+    def test_can_access_is_reused_until_user_is_added(self, mock_api):
+        collaborators = set()
+
+        def handler(request):
+            if request.method == "PUT":
+                collaborators.add("alice")
+                return httpx.Response(201, json={})
+            return access_handler(collaborators)(request)
+
+        requests = mock_api(handler)
+        user, repo = gr.User("alice"), make_repo()
+
+        assert not user.can_access(repo)
+        assert not user.can_access(repo)
+        repo.add_user(user)
+        assert user.can_access(repo)
+        assert [r.method for r in requests if "collaborators" in r.url.path] == [
+            "HEAD",
+            "PUT",
+            "HEAD",
+        ]
+
+    def test_can_access_expires(self, mock_api, monkeypatch):
+        monkeypatch.setattr(user_module, "_ACCESS_TTL", 0)
+        requests = mock_api(access_handler({"alice"}))
+        user, repo = gr.User("alice"), make_repo()
+
+        user.can_access(repo)
+        user.can_access(repo)
+
+        assert [r.method for r in requests].count("HEAD") == 2
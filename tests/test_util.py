@@ -0,0 +1,208 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from githubranger import util
+
+URL = "https://api.github.com/orgs/test_org"
+
+
+def link(page, rel):
+    return f'<https://api.github.com/items?per_page=2&page={page}>; rel="{rel}"'
+
+
+def etag_handler(body):
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
+
+    return handler
+
+
+class TestConditionalGet:
+    def test_revalidates_with_etag(self, mock_api):
+        requests = mock_api(etag_handler({"name": "test_org"}))
+
+        assert util.get(URL) == {"name": "test_org"}
+        assert util.get(URL) == {"name": "test_org"}
+        assert "If-None-Match" not in requests[0].headers
+        assert requests[1].headers["If-None-Match"] == '"v1"'
+
+    def test_cached_result_cannot_be_modified(self, mock_api):
+        mock_api(etag_handler({"name": "test_org"}))
+
+        util.get(URL)["name"] = "changed"
+
+        assert util.get(URL) == {"name": "test_org"}
+
+    def test_disk_cache_survives_new_process(self, mock_api, monkeypatch, tmp_path):
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            if request.headers["Accept"] == util._RAW_MEDIA_TYPE:
+                return httpx.Response(200, content=b"\x00raw", headers={"ETag": '"v1"'})
+            return httpx.Response(
+                200, json={"name": "test_org"}, headers={"ETag": '"v1"'}
+            )
+
+        requests = mock_api(handler)
+        path = tmp_path / "etag.sqlite"
+        util.enable_disk_cache(path)
+        util.get(URL)
+        util.get_raw(f"{URL}/file")
+
+        # A new process starts with an empty in-memory cache on the same database.
+        util._ETAG_CACHE._db.close()
+        monkeypatch.setattr(util, "_ETAG_CACHE", util._EtagCache(maxsize=16))
+        util.enable_disk_cache(path)
+
+        assert util.get(URL) == {"name": "test_org"}
+        assert util.get_raw(f"{URL}/file") == b"\x00raw"
+        assert [r.headers.get("If-None-Match") for r in requests[2:]] == ['"v1"'] * 2
+
+    def test_large_raw_bodies_are_not_cached(self, mock_api):
+        body = b"x" * (util._MAX_CACHED_RAW_SIZE + 1)
+        requests = mock_api(
+            lambda request: httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+        )
+
+        util.get_raw(URL)
+        util.get_raw(URL)
+
+        assert "If-None-Match" not in requests[1].headers
+
+
+class TestPaginate:
+    def test_fetches_numbered_pages(self, mock_api):
+        def handler(request):
+            page = int(request.url.params.get("page", 1))
+            links = [link(3, "last")]
+            if page < 3:
+                links.append(link(page + 1, "next"))
+            return httpx.Response(
+                200, json=[page] * 2, headers={"Link": ", ".join(links)}
+            )
+
+        requests = mock_api(handler)
+
+        pages = list(util.paginate("https://api.github.com/items", per_page=2))
+
+        assert pages == [[1, 1], [2, 2], [3, 3]]
+        assert len(requests) == 3
+
+    def test_follows_next_without_last(self, mock_api):
+        def handler(request):
+            cursor = request.url.params.get("after")
+            if cursor is None:
+                next_link = '<https://api.github.com/items?after=abc>; rel="next"'
+                return httpx.Response(200, json=[1], headers={"Link": next_link})
+            return httpx.Response(200, json=[2])
+
+        mock_api(handler)
+
+        pages = list(util.paginate("https://api.github.com/items"))
+
+        assert pages == [[1], [2]]
+
+
+class TestErrors:
+    def test_rejected_write(self, mock_api):
+        mock_api(lambda request: httpx.Response(422, json={"message": "Invalid"}))
+
+        with pytest.raises(util.RequestRejectedError, match="Invalid"):
+            util.post(URL, json={})
+
+    def test_rejected_read_is_not_not_found(self, mock_api):
+        mock_api(lambda request: httpx.Response(422, json={"message": "Invalid"}))
+
+        with pytest.raises(RuntimeError, match="422"):
+            util.get(URL)
+
+
+def flaky_handler(*failures):
+    """Answer with the given failure responses first, then succeed."""
+    responses = list(failures)
+
+    def handler(request):
+        if responses:
+            return responses.pop(0)
+        return httpx.Response(200, json={"name": "test_org"})
+
+    return handler
+
+
+class TestRetries:
+    def test_gateway_errors_are_retried(self, mock_api, monkeypatch):
+        monkeypatch.setattr(util, "_BACKOFF_FACTOR", 0)
+        requests = mock_api(flaky_handler(httpx.Response(503), httpx.Response(502)))
+
+        assert util.get(URL) == {"name": "test_org"}
+        assert len(requests) == 3
+
+    def test_post_is_not_retried(self, mock_api, monkeypatch):
+        monkeypatch.setattr(util, "_BACKOFF_FACTOR", 0)
+        requests = mock_api(flaky_handler(httpx.Response(503)))
+
+        with pytest.raises(RuntimeError, match="503"):
+            util.post(URL, json={})
+        assert len(requests) == 1
+
+    def test_rate_limited_requests_are_retried(self, mock_api):
+        exhausted = {
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(time.time()),
+        }
+        requests = mock_api(
+            flaky_handler(
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(403, headers=exhausted),
+            )
+        )
+
+        assert util.get(URL) == {"name": "test_org"}
+        assert len(requests) == 3
+
+
+class TestCoalescing:
+    def run_concurrently(self, mock_api, tokens):
+        entered = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            entered.set()
+            release.wait(timeout=5)
+            return httpx.Response(200, json={"n": len(calls)})
+
+        mock_api(handler)
+        results = []
+
+        def fetch(token):
+            results.append(util.get(URL, headers={"Authorization": token}))
+
+        threads = [threading.Thread(target=fetch, args=(token,)) for token in tokens]
+        threads[0].start()
+        entered.wait(timeout=5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        return calls, results
+
+    def test_identical_requests_share_one_call(self, mock_api):
+        calls, results = self.run_concurrently(mock_api, ["token a", "token a"])
+
+        assert len(calls) == 1
+        assert results[0] == results[1]
+
+    def test_requests_with_other_tokens_are_not_shared(self, mock_api):
+        calls, _ = self.run_concurrently(mock_api, ["token a", "token b"])
+
+        assert len(calls) == 2